@@ -1,3 +1,7 @@
+import numpy as np
+
+from aut_project.signals import Constant
+
 class PIDController:
     """
     PID Controller for a control loop.
@@ -14,9 +18,11 @@ class PIDController:
     Methods:
     - reset: resets the internal state
     - calculate: calculates the PID control signal based on the feedback value
+    - reset_sensitivity: resets the internal state and its parameter sensitivities
+    - calculate_sensitivity: calculates the control signal and its parameter sensitivities
     """
     def __init__(self, setpoint, Kp, Ki, Kd, freq, y_min=float('-inf'), y_max=float('inf')):
-        self.setpoint = setpoint if callable(setpoint) else lambda t: setpoint
+        self.setpoint = setpoint if callable(setpoint) else Constant(setpoint)
         self.Kp = Kp           # proportional gain
         self.Ki = Ki           # integral gain
         self.Kd = Kd           # derivative gain
@@ -27,6 +33,12 @@ class PIDController:
 
         self.integral = 0.0    # integral term with memory
         self.prev_error = 0.0  # previous error for derivative calculation
+        self.has_prev_error = False  # derivative is zero until an error is stored
+
+        # sensitivities to the parameter vector (default is [Kp, Ki, Kd])
+        self.offset = 0                  # index of own gains
+        self.d_integral = np.zeros(3)    # d(integral)/d(params)
+        self.d_prev_error = np.zeros(3)  # d(prev_error)/d(params)
 
     def reset(self):
         """
@@ -34,6 +46,7 @@ class PIDController:
         """
         self.integral = 0.0
         self.prev_error = 0.0
+        self.has_prev_error = False
 
     def calculate(self, measured_value, t):
         """
@@ -51,8 +64,9 @@ class PIDController:
 
         # calculate the PID terms
         self.integral += error * self.dt
-        derivative = (error - self.prev_error) / self.dt if t != 0 else 0.0
+        derivative = (error - self.prev_error) / self.dt if self.has_prev_error else 0.0
         self.prev_error = error
+        self.has_prev_error = True
 
         # calculate the control output
         y = self.Kp * error + self.Ki * self.integral + self.Kd * derivative
@@ -67,3 +81,64 @@ class PIDController:
 
         # saturated output
         return y
+
+    def reset_sensitivity(self, n_params, offset):
+        """
+        Reset the internal state and its sensitivities to the parameters.
+
+        Parameters:
+        - n_params: length of the parameter vector
+        - offset:   index of Kp in the parameter vector, followed by Ki and Kd
+        """
+        self.reset()
+        self.offset = offset                     # index of own gains
+        self.d_integral = np.zeros(n_params)     # d(integral)/d(params)
+        self.d_prev_error = np.zeros(n_params)   # d(prev_error)/d(params)
+
+    def calculate_sensitivity(self, measured_value, d_measured, t, d_setpoint=0.0):
+        """
+        Calculate the PID control signal and its sensitivities to the parameters.
+        Performs the same step as calculate, differentiated with respect to the
+        parameter vector. Saturated outputs have zero sensitivity.
+
+        Parameters:
+        - measured_value: current value from the system
+        - d_measured:     sensitivities of the measured value
+        - t:              current time
+        - d_setpoint:     sensitivities of the setpoint value
+
+        Returns:
+        - y:  saturated control output signal
+        - dy: sensitivities of the control output signal
+        """
+        # calculate the error from feedback
+        error = self.setpoint(t) - measured_value
+        d_error = d_setpoint - d_measured
+
+        # calculate the PID terms
+        self.integral += error * self.dt
+        self.d_integral += d_error * self.dt
+        if self.has_prev_error:
+            derivative = (error - self.prev_error) / self.dt
+            d_derivative = (d_error - self.d_prev_error) / self.dt
+        else:
+            derivative = 0.0
+            d_derivative = np.zeros_like(d_error)
+        self.prev_error = error
+        self.d_prev_error = d_error
+        self.has_prev_error = True
+
+        # calculate the control output
+        y = self.Kp * error + self.Ki * self.integral + self.Kd * derivative
+        dy = self.Kp * d_error + self.Ki * self.d_integral + self.Kd * d_derivative
+        dy[self.offset:self.offset + 3] += (error, self.integral, derivative)
+
+        # anti-windup
+        if y > self.y_max or y < self.y_min:
+            y = min(max(y, self.y_min), self.y_max)
+            dy = np.zeros_like(dy)
+            self.integral -= error * self.dt
+            self.d_integral -= d_error * self.dt
+
+        # saturated output
+        return y, dy
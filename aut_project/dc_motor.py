@@ -1,3 +1,5 @@
+import numpy as np
+
 class DCMotor:
     """
     DC Motor model
@@ -12,6 +14,7 @@ class DCMotor:
 
     Methods:
     - em_ode: returns the electromechanical ODE for the motor
+    - jacobian: returns the state and input matrices of the ODE
     """
     def __init__(self, Ra, La, J, k, b=0, T=0):
         self.Ra = Ra  # armature resistance          [Ohm]
@@ -40,3 +43,18 @@ class DCMotor:
             return [di_dt, dw_dt]
         
         return f
+
+    def jacobian(self):
+        """
+        State and input matrices of the electromechanical ODE.
+        The model is linear, so dx/dt = A x + B u + [0, -T/J].
+
+        Returns:
+        - A: state matrix d(dx/dt)/dx
+        - B: input vector d(dx/dt)/du
+        """
+        A = np.array([[-self.Ra / self.La, -self.k / self.La],
+                      [self.k / self.J, -self.b / self.J]])
+        B = np.array([1.0 / self.La, 0.0])
+
+        return A, B
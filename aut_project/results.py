@@ -0,0 +1,160 @@
+import numpy as np
+
+class SimulationResult:
+    """
+    Results of a DC motor simulation.
+    Stores the recorded signals in one contiguous 2D array (one row per channel)
+    and exposes them as named views together with the simulation metadata.
+
+    Parameters:
+    - data:   array of shape (4, n) with rows [t, u, i, w]
+    - dt:     time step [s]
+    - params: motor parameters (Ra, La, J, k, b, T)
+    - gains:  controller gains keyed by loop name
+
+    Methods:
+    - from_motor: allocate an empty result for a simulation run
+    - window: time-window view of the result without copying
+    - power: electrical input power u*i [W]
+    - torque: electromagnetic torque k*i [N*m]
+    - copper_loss: copper losses Ra*i^2 [W]
+    - energy: cumulative electrical input energy [J]
+    """
+    CHANNELS = ("t", "u", "i", "w")
+
+    def __init__(self, data, dt, params=None, gains=None):
+        self.data = data                   # recorded signals [t, u, i, w]
+        self.dt = dt                       # time step [s]
+        self.params = params or {}         # motor parameters
+        self.gains = gains or {}           # controller gains
+        self._cache = {}                   # lazily computed derived signals
+
+    @classmethod
+    def from_motor(cls, dc_motor, duration, dt, gains=None):
+        """
+        Allocate a result for a simulation run and fill in the time values.
+
+        Parameters:
+        - dc_motor: instance of a DCMotor class
+        - duration: total simulation time [s]
+        - dt:       time step [s]
+        - gains:    controller gains keyed by loop name
+
+        Returns:
+        - result with the time row set and the signal rows zeroed
+        """
+        t_values = np.arange(0, duration, dt)
+        data = np.zeros((len(cls.CHANNELS), len(t_values)))
+        data[0] = t_values
+
+        params = {name: getattr(dc_motor, name)
+                  for name in ("Ra", "La", "J", "k", "b", "T")}
+
+        return cls(data, dt, params, gains)
+
+    @staticmethod
+    def pid_gains(controller):
+        """
+        Collect the tuning of a PID controller for the result metadata.
+
+        Parameters:
+        - controller: instance of a PIDController class
+
+        Returns:
+        - dictionary of the gains and the controller frequency
+        """
+        return {"Kp": controller.Kp,
+                "Ki": controller.Ki,
+                "Kd": controller.Kd,
+                "freq": controller.freq}
+
+    # named column views
+    @property
+    def t(self):
+        return self.data[0]  # time values [s]
+
+    @property
+    def u(self):
+        return self.data[1]  # armature voltage [V]
+
+    @property
+    def i(self):
+        return self.data[2]  # armature current [A]
+
+    @property
+    def w(self):
+        return self.data[3]  # angular velocity [rad/s]
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    def __iter__(self):
+        # allows unpacking as t, u, i, w
+        return iter(self.data)
+
+    def __getitem__(self, index):
+        # positional access in the order t, u, i, w
+        return self.data[index]
+
+    def _derived(self, name, compute):
+        """
+        Return a cached derived signal, computing it on first access.
+        """
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    def power(self):
+        """
+        Electrical input power of the armature.
+
+        Returns:
+        - p: power values u*i [W]
+        """
+        return self._derived("power", lambda: self.u * self.i)
+
+    def torque(self):
+        """
+        Electromagnetic torque of the motor.
+
+        Returns:
+        - T_em: torque values k*i [N*m]
+        """
+        return self._derived("torque", lambda: self.params["k"] * self.i)
+
+    def copper_loss(self):
+        """
+        Resistive losses in the armature winding.
+
+        Returns:
+        - p_cu: copper loss values Ra*i^2 [W]
+        """
+        return self._derived("copper_loss",
+                             lambda: self.params["Ra"] * np.square(self.i))
+
+    def energy(self):
+        """
+        Electrical input energy accumulated from the start of the result.
+
+        Returns:
+        - E: cumulative energy values [J]
+        """
+        return self._derived("energy",
+                             lambda: np.cumsum(self.power()) * self.dt)
+
+    def window(self, t_start, t_end):
+        """
+        Time-window view of the result. The signals are not copied.
+
+        Parameters:
+        - t_start: start of the window [s]
+        - t_end:   end of the window [s] (exclusive)
+
+        Returns:
+        - result restricted to t_start <= t < t_end
+        """
+        start = np.searchsorted(self.t, t_start, side="left")
+        end = np.searchsorted(self.t, t_end, side="left")
+
+        return SimulationResult(self.data[:, start:end],
+                                self.dt, self.params, self.gains)
@@ -10,14 +10,14 @@ class Scope:
         Plot input voltage, current, and angular velocity.
 
         Parameters:
-        - t:       time array
-        - results: simulation results containing armature voltage, current and angular velocity
+        - title:   plot title
+        - results: SimulationResult containing armature voltage, current and angular velocity
         - w_ref:   reference angular velocity
         """
-        t = results[0]  # time values [s]
-        u = results[1]  # armature voltage [V]
-        i = results[2]  # armature current [A]
-        w = results[3]  # angular velocity [rad/s]
+        t = results.t  # time values [s]
+        u = results.u  # armature voltage [V]
+        i = results.i  # armature current [A]
+        w = results.w  # angular velocity [rad/s]
 
         if w_ref is not None and not callable(w_ref):
             const_val = w_ref
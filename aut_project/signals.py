@@ -1,5 +1,44 @@
 import numpy as np
 
+class Constant:
+    """
+    Constant signal generator.
+    Keeps the signal at a fixed level for all time.
+
+    Parameters:
+    - value: the constant signal level
+
+    Methods:
+    - __call__(t): evaluates the constant signal at time
+    - hold_until(t): time of the next discontinuity (never)
+    """
+    def __init__(self, value):
+        self.value = value  # constant signal level
+
+    def __call__(self, t):
+        """
+        Evaluate the constant signal at specified time.
+
+        Parameters:
+        - t: time [s]
+
+        Returns:
+        - signal level evaluated at time t
+        """
+        return self.value
+
+    def hold_until(self, t):
+        """
+        Time until which the signal keeps its level at specified time.
+
+        Parameters:
+        - t: time [s]
+
+        Returns:
+        - infinity, the level never changes
+        """
+        return float('inf')
+
 class Heaviside:
     """
     Heaviside step signal generator.
@@ -8,6 +47,10 @@ class Heaviside:
     Parameters:
     - value: the constant signal level after delay
     - delay: the time after which the signal activates
+
+    Methods:
+    - __call__(t): evaluates the step signal at time
+    - hold_until(t): time of the next discontinuity
     """
     def __init__(self, value, delay):
         self.value = value  # constant signal level
@@ -25,6 +68,18 @@ class Heaviside:
         """
         return self.value if t >= self.delay else 0.0
 
+    def hold_until(self, t):
+        """
+        Time until which the signal keeps its level at specified time.
+
+        Parameters:
+        - t: time [s]
+
+        Returns:
+        - time of the next discontinuity [s]
+        """
+        return self.delay if t < self.delay else float('inf')
+
 class SquareWave:
     """
     Square wave signal generator.
@@ -37,6 +92,7 @@ class SquareWave:
 
     Methods:
     - __call__(t): evaluates the square wave at time
+    - hold_until(t): time of the next edge
     """
     def __init__(self, freq, high, low, pwm=0.5):
         self.freq = freq  # frequency [Hz]
@@ -59,6 +115,23 @@ class SquareWave:
 
         return np.where(t_mod < (T * self.pwm), self.high, self.low)
 
+    def hold_until(self, t):
+        """
+        Time until which the signal keeps its level at specified time.
+
+        Parameters:
+        - t: time [s]
+
+        Returns:
+        - time of the next edge [s]
+        """
+        T = 1.0 / self.freq  # period [s]
+        t_mod = np.mod(t, T) # position in the period
+
+        if t_mod < T * self.pwm:
+            return t - t_mod + T * self.pwm
+        return t - t_mod + T
+
 class TriangleWave:
     """
     Triangle wave signal generator.
@@ -96,6 +169,19 @@ class TriangleWave:
 
         return self.low + np.where(t_mod < T/2, ramping, 2*amp - ramping)
 
+    def hold_until(self, t):
+        """
+        Time until which the signal keeps its level at specified time.
+        The triangle wave is never constant.
+
+        Parameters:
+        - t: time [s]
+
+        Returns:
+        - t itself
+        """
+        return t
+
 class SineWave:
     """
     Sine wave signal generator.
@@ -124,3 +210,16 @@ class SineWave:
         omega = 2 * np.pi * self.freq # angular frequency [rad/s]
         
         return self.amp * np.sin(omega * t) + self.offset
+
+    def hold_until(self, t):
+        """
+        Time until which the signal keeps its level at specified time.
+        The sine wave is never constant.
+
+        Parameters:
+        - t: time [s]
+
+        Returns:
+        - t itself
+        """
+        return t
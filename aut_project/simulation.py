@@ -1,5 +1,7 @@
 import numpy as np
 
+from aut_project.results import SimulationResult
+
 class Simulation:
     """
     Methods for simulating the response of a DC motor.
@@ -9,9 +11,10 @@ class Simulation:
     - simulate_open_loop: open-loop simulation with a reference voltage signal
     - simulate_closed_loop: closed-loop simulation with a controller
     - simulate_cascade: cascade control simulation
+    - simulate_cascade_gradient: cascade tracking cost and its gradient to the PID gains
     """
     @staticmethod
-    def simulate(mode, dc_motor, duration, dt, *args):
+    def simulate(mode, dc_motor, duration, dt, *args, **kwargs):
         """
         Dispatch simulation based on mode.
 
@@ -21,10 +24,15 @@ class Simulation:
         - duration:  simulation duration [s]
         - dt:        time step [s]
         - *args:     additional arguments depending on mode
+        - **kwargs:  keyword options of the "closed" and "cascade" modes
 
         Returns:
         - simulation results
         """
+        if mode in ("open", "cascade_gradient") and kwargs:
+            raise TypeError(f"Unexpected keyword arguments for mode {mode}: "
+                            f"{', '.join(kwargs)}")
+
         if mode == "open":
             u_reference = args[0]
             x0 = args[1] if len(args) > 1 else None
@@ -39,7 +47,8 @@ class Simulation:
             return Simulation.simulate_closed_loop(dc_motor,
                                                    duration, dt,
                                                    controller,
-                                                   x0)
+                                                   x0,
+                                                   **kwargs)
 
         elif mode == "cascade":
             speed_controller = args[0]
@@ -49,7 +58,18 @@ class Simulation:
                                                duration, dt,
                                                speed_controller,
                                                current_controller,
-                                               x0)
+                                               x0,
+                                               **kwargs)
+
+        elif mode == "cascade_gradient":
+            speed_controller = args[0]
+            current_controller = args[1]
+            x0 = args[2] if len(args) > 2 else None
+            return Simulation.simulate_cascade_gradient(dc_motor,
+                                                        duration, dt,
+                                                        speed_controller,
+                                                        current_controller,
+                                                        x0)
 
         else:
             raise ValueError(f"Unknown simulation mode: {mode}")
@@ -67,24 +87,18 @@ class Simulation:
         - x0:           initial state [i(0), w(0)]
 
         Returns:
-        - t_values: time values
-        - u_values: armature voltage values
-        - i_values: armature current values
-        - w_values: angular velocity values
+        - result: SimulationResult with time, armature voltage,
+                  armature current and angular velocity values
         """
-        # initialize time values
-        t_values = np.arange(0, duration, dt)
+        # allocate results and time values
+        result = SimulationResult.from_motor(dc_motor, duration, dt)
+        t_values = result.t
 
         # initical conditions
         if x0 is None:
             x0 = [0.0, 0.0]
         x = np.array(x0, dtype=float)
 
-        # initialize lists for results
-        u_values = []
-        i_values = []
-        w_values = []
-
         # simulation loop
         for j in range(len(t_values)):
             # simulate using Euler integration
@@ -92,15 +106,14 @@ class Simulation:
             dxdt = f(x, t_values[j])
             x += dt * np.array(dxdt)
 
-            # append results
-            u_values.append(u_reference(t_values[j]))
-            i_values.append(x[0])
-            w_values.append(x[1])
+            # store results
+            result.data[1:, j] = u_reference(t_values[j]), x[0], x[1]
 
-        return np.array(t_values), np.array(u_values), np.array(i_values), np.array(w_values)
+        return result
 
     @staticmethod
-    def simulate_closed_loop(dc_motor, duration, dt, controller, x0=None):
+    def simulate_closed_loop(dc_motor, duration, dt, controller, x0=None, reset=True,
+                             fast_forward=False, settle_atol=1e-3, settle_rtol=1e-4):
         """
         Closed-loop simulation with a controller.
 
@@ -110,51 +123,66 @@ class Simulation:
         - dt:          time step [s]
         - controller:  instance of a controller class
         - x0:          initial state [i(0), w(0)]
+        - reset:       reset the controller before the simulation
+        - fast_forward: skip settled intervals until the next reference change
+        - settle_atol:  absolute rate regarded as settled [unit/s]
+        - settle_rtol:  rate relative to the value regarded as settled [1/s]
 
         Returns:
-        - t_values: time values
-        - u_values: armature voltage values
-        - i_values: armature current values
-        - w_values: angular velocity values
+        - result: SimulationResult with time, armature voltage,
+                  armature current and angular velocity values
         """
-        # initialize time values
-        t_values = np.arange(0, duration, dt)
+        # allocate results and time values
+        gains = {"controller": SimulationResult.pid_gains(controller)}
+        result = SimulationResult.from_motor(dc_motor, duration, dt, gains)
+        t_values = result.t
 
         # initical conditions
         if x0 is None:
             x0 = [0.0, 0.0]
         x = np.array(x0, dtype=float)
 
-        # initialize lists for results
-        u_values = []
-        i_values = []
-        w_values = []
-
         # reset the controller
-        controller.reset()
+        if reset:
+            controller.reset()
 
         # update interval for the controller
         update_interval = max(1, int(round(controller.dt / dt)))
 
+        # settled checks at controller updates at least 1 ms apart
+        check_interval = update_interval * max(1, int(round(1e-3 / (update_interval * dt))))
+
         # simulation loop
-        for j in range(len(t_values)):
+        j = 0
+        while j < len(t_values):
             # zero-order hold
             if j % update_interval == 0:
                 u = controller.calculate(x[1], t_values[j])
 
+            # fast-forward through settled intervals
+            if fast_forward and j % check_interval == 0:
+                j_end = Simulation._settled_until(dc_motor, controller.setpoint,
+                                                  [(controller, u)], x, u,
+                                                  t_values, j, update_interval,
+                                                  settle_atol, settle_rtol)
+                if j_end > j:
+                    result.data[1:, j:j_end] = np.array([u, x[0], x[1]])[:, None]
+                    j = j_end
+                    continue
+
             # Euler integration
             f = dc_motor.em_ode(lambda _: u)
             dxdt = f(x, t_values[j])
             x += dt * np.array(dxdt)
 
-            u_values.append(u)
-            i_values.append(x[0])
-            w_values.append(x[1])
+            result.data[1:, j] = u, x[0], x[1]
+            j += 1
 
-        return np.array(t_values), np.array(u_values), np.array(i_values), np.array(w_values)
+        return result
 
     @staticmethod
-    def simulate_cascade(dc_motor, duration, dt, speed_controller, current_controller, x0=None):
+    def simulate_cascade(dc_motor, duration, dt, speed_controller, current_controller, x0=None, reset=True,
+                         fast_forward=False, settle_atol=1e-3, settle_rtol=1e-4):
         """
         Cascade control simulation.
 
@@ -165,35 +193,41 @@ class Simulation:
         - speed_controller:    instance of a controller class
         - current_controller:  instance of a controller class
         - x0:                  initial state [i(0), w(0)]
+        - reset:               reset the controllers before the simulation
+        - fast_forward:        skip settled intervals until the next reference change
+        - settle_atol:         absolute rate regarded as settled [unit/s]
+        - settle_rtol:         rate relative to the value regarded as settled [1/s]
 
         Returns:
-        - t_values: time values
-        - u_values: armature voltage values
-        - i_values: armature current values
-        - w_values: angular velocity values
+        - result: SimulationResult with time, armature voltage,
+                  armature current and angular velocity values
         """
-        # initialize time values
-        t_values = np.arange(0, duration, dt)
+        # allocate results and time values
+        gains = {"speed": SimulationResult.pid_gains(speed_controller),
+                 "current": SimulationResult.pid_gains(current_controller)}
+        result = SimulationResult.from_motor(dc_motor, duration, dt, gains)
+        t_values = result.t
 
         # initical conditions
         if x0 is None:
             x0 = [0.0, 0.0]
         x = np.array(x0, dtype=float)
 
-        # Initialize result storage
-        u_values = []
-        i_values = []
-        w_values = []
-
         # reset the controllers
-        speed_controller.reset()
-        current_controller.reset()
+        if reset:
+            speed_controller.reset()
+            current_controller.reset()
 
         # update intervals
         update_speed = max(1, int(round(speed_controller.dt / dt)))
         update_current = max(1, int(round(current_controller.dt / dt)))
+        update_both = np.lcm(update_speed, update_current)
 
-        for j in range(len(t_values)):
+        # settled checks at common controller updates at least 1 ms apart
+        check_interval = update_both * max(1, int(round(1e-3 / (update_both * dt))))
+
+        j = 0
+        while j < len(t_values):
             # zero-order hold for outer loop
             if j % update_speed == 0:
                 i_reference = speed_controller.calculate(x[1], t_values[j])
@@ -203,14 +237,151 @@ class Simulation:
                 current_controller.setpoint = lambda t: i_reference
                 u = current_controller.calculate(x[0], t_values[j])
 
+            # fast-forward through settled intervals
+            if fast_forward and j % check_interval == 0:
+                j_end = Simulation._settled_until(dc_motor, speed_controller.setpoint,
+                                                  [(speed_controller, i_reference),
+                                                   (current_controller, u)],
+                                                  x, u, t_values, j, update_both,
+                                                  settle_atol, settle_rtol)
+                if j_end > j:
+                    result.data[1:, j:j_end] = np.array([u, x[0], x[1]])[:, None]
+                    j = j_end
+                    continue
+
             # Euler integration
             f = dc_motor.em_ode(lambda _: u)
             dxdt = f(x, t_values[j])
             x += dt * np.array(dxdt)
 
             # Store results
-            u_values.append(u)
-            i_values.append(x[0])
-            w_values.append(x[1])
+            result.data[1:, j] = u, x[0], x[1]
+            j += 1
+
+        return result
+
+    @staticmethod
+    def simulate_cascade_gradient(dc_motor, duration, dt, speed_controller, current_controller, x0=None):
+        """
+        Cascade control simulation with forward sensitivity equations.
+        Runs the same discrete simulation as simulate_cascade while propagating
+        the sensitivities of the motor and controller states to the six PID gains,
+        so the tracking cost and its exact gradient are obtained in one pass.
+
+        Parameters:
+        - dc_motor:            instance of a DCMotor class
+        - duration:            total simulation time [s]
+        - dt:                  time step [s]
+        - speed_controller:    instance of a PIDController class
+        - current_controller:  instance of a PIDController class
+        - x0:                  initial state [i(0), w(0)]
+
+        Returns:
+        - cost:     integral squared speed error (ISE) [rad^2/s]
+        - gradient: d(cost)/d(gains) in the order
+                    [Kp_speed, Ki_speed, Kd_speed, Kp_current, Ki_current, Kd_current]
+        """
+        # initialize time values
+        t_values = np.arange(0, duration, dt)
 
-        return np.array(t_values), np.array(u_values), np.array(i_values), np.array(w_values)
+        # initical conditions
+        if x0 is None:
+            x0 = [0.0, 0.0]
+        x = np.array(x0, dtype=float)
+
+        # state sensitivities d[i, w]/d(gains)
+        n_params = 6
+        dx = np.zeros((2, n_params))
+
+        # linearized motor model for the sensitivity equations
+        A, B = dc_motor.jacobian()
+        Phi = np.eye(2) + dt * A
+        Gamma = dt * B
+
+        # reset the controllers and their sensitivities
+        speed_controller.reset_sensitivity(n_params, 0)
+        current_controller.reset_sensitivity(n_params, 3)
+
+        # update intervals
+        update_speed = max(1, int(round(speed_controller.dt / dt)))
+        update_current = max(1, int(round(current_controller.dt / dt)))
+
+        cost = 0.0
+        gradient = np.zeros(n_params)
+
+        for j in range(len(t_values)):
+            # zero-order hold for outer loop
+            if j % update_speed == 0:
+                i_reference, di_reference = speed_controller.calculate_sensitivity(
+                    x[1], dx[1], t_values[j])
+
+            # zero-order hold for inner loop
+            if j % update_current == 0:
+                current_controller.setpoint = lambda t: i_reference
+                u, du = current_controller.calculate_sensitivity(
+                    x[0], dx[0], t_values[j], di_reference)
+
+            # Euler integration
+            f = dc_motor.em_ode(lambda _: u)
+            dxdt = f(x, t_values[j])
+            x += dt * np.array(dxdt)
+            dx = Phi @ dx + np.outer(Gamma, du)
+
+            # accumulate the cost and its gradient
+            error = speed_controller.setpoint(t_values[j]) - x[1]
+            cost += error**2 * dt
+            gradient -= 2 * error * dt * dx[1]
+
+        return cost, gradient
+
+    @staticmethod
+    def _settled_until(dc_motor, reference, loops, x, u, t_values, j, update_interval, atol, rtol):
+        """
+        Index up to which a settled simulation can be fast-forwarded.
+        The simulation is settled when the motor state and every integral term
+        change slower than atol + rtol * |value| per second and the reference
+        keeps its level. Integrators of saturated controllers are frozen by the
+        anti-windup and those with Ki = 0 have no state. At such an equilibrium
+        the solution stays constant, so the interval up to the last controller
+        update before the next reference change can be skipped.
+
+        Parameters:
+        - dc_motor:        instance of a DCMotor class
+        - reference:       reference signal of the outer loop
+        - loops:           pairs of controller and its current output
+        - x:               motor state [i, w]
+        - u:               armature voltage [V]
+        - t_values:        time values
+        - j:               current index at a controller update
+        - update_interval: number of time steps between controller updates
+        - atol:            absolute rate tolerance [unit/s]
+        - rtol:            relative rate tolerance [1/s]
+
+        Returns:
+        - j_end: index to continue the simulation from (j if not settled)
+        """
+        # integral term rates Ki * error of the unsaturated controllers
+        for controller, y in loops:
+            saturated = y >= controller.y_max or y <= controller.y_min
+            if controller.Ki == 0 or saturated:
+                continue
+            if abs(controller.Ki * controller.prev_error) > atol + rtol * abs(y):
+                return j
+
+        # motor state rates
+        f = dc_motor.em_ode(lambda _: u)
+        dxdt = np.array(f(x, t_values[j]))
+        if np.any(np.abs(dxdt) > atol + rtol * np.abs(x)):
+            return j
+
+        # time of the next reference change
+        hold_until = getattr(reference, "hold_until", None)
+        if hold_until is None:
+            return j
+        t_next = hold_until(t_values[j])
+
+        # last controller update before the reference change
+        index = np.searchsorted(t_values, t_next)
+        j_end = (index - 1) // update_interval * update_interval
+
+        return max(j, j_end)
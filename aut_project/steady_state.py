@@ -0,0 +1,162 @@
+import numpy as np
+
+from aut_project.simulation import Simulation
+
+class SteadyState:
+    """
+    Methods for finding the periodic steady state of a DC motor simulation.
+
+    The one-period map z -> P(z) takes the motor state and the controller
+    states at the start of a period to their values one period later. The
+    settled periodic response is its fixed point, found by Newton shooting
+    with a finite-difference Jacobian refined by Broyden updates.
+
+    Methods:
+    - periodic: settled period of an open-loop, closed-loop or cascade simulation
+    """
+    @staticmethod
+    def periodic(mode, dc_motor, dt, *args, period=None, tol=1e-6, max_iter=20, warmup=3):
+        """
+        Find the settled period of a simulation with a periodic reference.
+
+        Parameters:
+        - mode:      simulation mode ("open", "closed" or "cascade")
+        - dc_motor:  instance of DCMotor
+        - dt:        time step [s], adjusted to a whole number of steps per period
+        - *args:     reference or controllers as for Simulation.simulate
+        - period:    period of the reference [s] (default is 1/freq of the reference)
+        - tol:       relative tolerance on each component of the period map residual
+        - max_iter:  maximum number of Newton iterations
+        - warmup:    number of periods simulated from rest before the Newton iterations
+
+        Returns:
+        - result: SimulationResult of one settled period
+        """
+        controllers = SteadyState._controllers(mode, args)
+
+        # period of the reference signal
+        if period is None:
+            reference = args[0] if mode == "open" else controllers[0].setpoint
+            if not hasattr(reference, "freq"):
+                raise ValueError("Reference is not periodic, specify the period")
+            period = 1.0 / reference.freq
+
+        # snap the time step to a whole number of controller updates per period
+        update_interval = 1
+        for controller in controllers:
+            update_interval = np.lcm(update_interval, max(1, int(round(controller.dt / dt))))
+        n_steps = max(1, int(round(period / dt / update_interval))) * update_interval
+        dt = period / n_steps
+
+        # start from a few periods simulated from rest, so that the Newton
+        # iterations stay near the limit cycle reached by the simulation
+        z = np.zeros(2 + 2 * len(controllers))
+        result, z_end = SteadyState._period_map(mode, dc_motor, period, dt,
+                                                args, controllers, z)
+        for _ in range(warmup):
+            z = z_end
+            result, z_end = SteadyState._period_map(mode, dc_motor, period, dt,
+                                                    args, controllers, z)
+        residual = z_end - z
+        jacobian = None
+
+        for _ in range(max_iter):
+            if SteadyState._error(residual, z) <= tol:
+                return result
+
+            # finite-difference Jacobian of the residual on the first iteration
+            if jacobian is None:
+                jacobian = np.empty((len(z), len(z)))
+                for n in range(len(z)):
+                    h = 1e-6 * max(1.0, abs(z[n]))
+                    z_step = z.copy()
+                    z_step[n] += h
+                    _, z_step_end = SteadyState._period_map(mode, dc_motor, period, dt,
+                                                            args, controllers, z_step)
+                    jacobian[:, n] = ((z_step_end - z_step) - residual) / h
+
+            # Newton step on the residual P(z) - z, states that do not affect
+            # the map (e.g. a saturated integrator) are left unchanged
+            step = np.linalg.lstsq(jacobian, -residual, rcond=1e-6)[0]
+
+            # limit the step of each integral term to the controller output range,
+            # larger steps can wind an integrator into a locked saturated state
+            for n, controller in enumerate(controllers):
+                change = abs(controller.Ki * step[2 + 2 * n])
+                output_range = controller.y_max - controller.y_min
+                if change > output_range:
+                    step *= output_range / change
+            result_new, z_end_new = SteadyState._period_map(mode, dc_motor, period, dt,
+                                                            args, controllers, z + step)
+
+            # Broyden update of the Jacobian
+            residual_new = z_end_new - (z + step)
+            jacobian += np.outer(residual_new - residual - jacobian @ step, step) / (step @ step)
+
+            if SteadyState._error(residual_new, z + step) < SteadyState._error(residual, z):
+                z = z + step
+                result, z_end = result_new, z_end_new
+            else:
+                # fall back to simulating the next period
+                z = z_end
+                result, z_end = SteadyState._period_map(mode, dc_motor, period, dt,
+                                                        args, controllers, z)
+            residual = z_end - z
+
+        raise RuntimeError(f"Periodic steady state did not converge in {max_iter} iterations")
+
+    @staticmethod
+    def _error(residual, z):
+        """
+        Largest residual of the period map relative to the state components.
+        """
+        return np.max(np.abs(residual) / (1.0 + np.abs(z)))
+
+    @staticmethod
+    def _controllers(mode, args):
+        """
+        Controllers whose states belong to the period map.
+        """
+        if mode == "open":
+            return []
+        elif mode == "closed":
+            return [args[0]]
+        elif mode == "cascade":
+            return [args[0], args[1]]
+        else:
+            raise ValueError(f"Unknown simulation mode: {mode}")
+
+    @staticmethod
+    def _period_map(mode, dc_motor, period, dt, args, controllers, z):
+        """
+        Simulate one period from the state z = [i, w, integral, prev_error, ...].
+
+        Returns:
+        - result: SimulationResult of the period
+        - z_end:  state at the end of the period
+        """
+        x0 = z[:2]
+
+        # exactly period/dt steps, the next period starts at t = period
+        duration = period - dt / 2
+
+        # set the controller states
+        for n, controller in enumerate(controllers):
+            controller.integral = z[2 + 2 * n]
+            controller.prev_error = z[3 + 2 * n]
+            controller.has_prev_error = True
+
+        if mode == "open":
+            result = Simulation.simulate_open_loop(dc_motor, duration, dt, args[0], x0)
+        elif mode == "closed":
+            result = Simulation.simulate_closed_loop(dc_motor, duration, dt, args[0],
+                                                     x0, reset=False)
+        else:
+            result = Simulation.simulate_cascade(dc_motor, duration, dt, args[0], args[1],
+                                                 x0, reset=False)
+
+        z_end = [result.i[-1], result.w[-1]]
+        for controller in controllers:
+            z_end += [controller.integral, controller.prev_error]
+
+        return result, np.array(z_end)
@@ -48,7 +48,8 @@ results = Simulation.simulate("cascade",
                               duration, dt,
                               speed_controller,
                               current_controller,
-                              None)
+                              None,
+                              fast_forward=True)
 
 # plot results
 title = (